@@ -1,8 +1,23 @@
+import argparse
 import csv
+import functools
+import re
 from pathlib import Path
+import numpy as np
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
 import sys
 import hashlib
+from typing import Iterable, Iterator
+
+try:
+    # Optional: multithreaded CSV parsing (pandas engine) and writing (pyarrow.csv)
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
 
 BASE = Path(__file__).resolve().parent
 # !!!fix COLS to reference actual columns!!!
@@ -11,6 +26,15 @@ COLS = ["time", "name", "type", "status", "location_id", "description", "geo_poi
 # Define paths (use relative paths so script runs regardless of user home differences)
 CSV_REL = BASE / "data"/"raw"/"raw"/"animal_sightings.csv"
 OUT_REL = BASE / "data"/"clean"/"animal_sightings_clean.csv"
+OUT_PARQUET = BASE / "data"/"clean"/"animal_sightings_clean.parquet"
+
+_UNNAMED_RE = re.compile(r'^Unnamed')
+
+# Highly repetitive sighting columns, stored as categoricals so each distinct string is held once
+CATEGORY_COLS = ["name", "type", "status", "ranger_id", "direction_of_travel", "description_of_behavior"]
+
+# Rows per chunk when streaming the sightings CSV through main()
+CHUNK_ROWS = 200_000
 
 # Check code is formatted correctly
 def new_sighting():
@@ -34,30 +58,81 @@ def new_sighting():
     f.close()
 
 def detect_delimiter(path: Path, sample_size: int = 8192) -> str:
-    with path.open("r", encoding="utf-8", newline="") as f:
-        sample = f.read(sample_size)
+    # Keyed on mtime/size so repeated GUI loads of an unchanged file skip the read and sniff
+    st = path.stat()
+    return _cached_delimiter(str(path), st.st_mtime_ns, st.st_size, sample_size)
+
+@functools.lru_cache(maxsize=32)
+def _cached_delimiter(path: str, mtime_ns: int, size: int, sample_size: int) -> str:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return _sniff_delimiter(f.read(sample_size))
+
+def _sniff_delimiter(sample: str) -> str:
     try:
         dialect = csv.Sniffer().sniff(sample)
         return dialect.delimiter
     except Exception:
         return ","
 
-def load_data(path: Path) -> pd.DataFrame:
-    if not path.exists():
-        raise FileNotFoundError(f"Input CSV not found: {path}")
+def _sha256_hex(values) -> list:
+    values = list(values)
+    # Encode every key in one C-level call, then split back into per-row bytes
+    chunks = "\x00".join(values).encode("utf-8").split(b"\x00")
+    if len(chunks) != len(values):
+        # A key contained NUL; fall back to per-row encoding
+        chunks = [v.encode("utf-8") for v in values]
+    # Bind the constructor once so the loop only pays for the OpenSSL digest.
+    # This stays single-threaded: hashlib keeps the GIL for inputs under 2 KiB,
+    # and shipping keys to worker processes costs more than hashing them here.
+    sha256 = hashlib.sha256
+    return [sha256(b).hexdigest() for b in chunks]
 
-    sep = detect_delimiter(path)
-    df = pd.read_csv(
-        path,
-        sep=sep,
-        encoding="utf-8",
-        skipinitialspace=True,
-        parse_dates=["time"] if "time" in pd.read_csv(path, nrows=0).columns else [],
-        infer_datetime_format=True,
-        low_memory=False,
-    )
+def _parse_times(s: pd.Series) -> pd.Series:
+    # Sightings repeat timestamps heavily, so parse each distinct string once
+    codes, uniq = pd.factorize(s)
+    try:
+        parsed = pd.to_datetime(uniq)
+    except (ValueError, TypeError):
+        # Leave unparseable columns as-is, like parse_dates does
+        return s
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=s.index, name=s.name)
+
+class _ChunkTimesError(ValueError):
+    """A chunk's times cannot be parsed the way the whole column would be."""
+
+def _parse_chunk_times(s: pd.Series, fmt: str | None) -> pd.Series:
+    # Same parse as _parse_times, but with the format guessed from the file's first time,
+    # which is what pd.to_datetime does when it sees the whole column at once
+    codes, uniq = pd.factorize(s)
+    try:
+        parsed = pd.to_datetime(uniq, format=fmt or "mixed")
+    except (ValueError, TypeError) as e:
+        raise _ChunkTimesError(str(e)) from e
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=s.index, name=s.name)
+
+def _text_array(s: pd.Series) -> np.ndarray:
+    # Same text as .astype(str), as a NumPy string array. Going through object keeps
+    # full-width values: pandas' str dtype sizes to_numpy(dtype=str) wrongly when
+    # missing values are present and truncates every entry to one character
+    return s.astype(str).to_numpy(dtype=object).astype(str)
+
+def _coord_str(s: pd.Series) -> np.ndarray:
+    # Same text as .fillna('').astype(str); only float columns take the vectorized path,
+    # since forcing integers through float64 would turn "10" into "10.0"
+    if s.dtype.kind != "f":
+        return _text_array(s.fillna(""))
+    vals = s.to_numpy(dtype="float64", na_value=np.nan)
+    out = vals.astype("U32")
+    out[np.isnan(vals)] = ""
+    return out
+
+def _tidy_frame(df: pd.DataFrame, parse_times: bool = True) -> pd.DataFrame:
+    if parse_times and "time" in df.columns:
+        df["time"] = _parse_times(df["time"])
     # Drop columns with names like 'Unnamed: 0'
-    df =df.loc[:, ~df.columns.str.match(r'^Unnamed')]
+    keep = [not _UNNAMED_RE.match(str(c)) for c in df.columns]
+    if not all(keep):
+        df = df.loc[:, keep]
 
     # ensure numeric coordinates (only convert if column exists)
     if "longitude" in df.columns:
@@ -67,43 +142,182 @@ def load_data(path: Path) -> pd.DataFrame:
     if "elevation_in_meters" in df.columns:
         df["elevation_in_meters"] = pd.to_numeric(df["elevation_in_meters"], errors="coerce")
     else:
-        df["elevation_in_meters"] = pd.Series([pd.NA] * len(df), dtype="Float64")
+        df["elevation_in_meters"] = pd.Series([pd.NA] * len(df), index=df.index, dtype="Float64")
     return df
 
+def load_data(path: Path) -> pd.DataFrame:
+    if not path.exists():
+        raise FileNotFoundError(f"Input CSV not found: {path}")
+
+    sep = detect_delimiter(path)
+    df = None
+    if _HAS_PYARROW:
+        try:
+            df = _read_csv_arrow(path, sep)
+        except Exception:
+            # Anything the Arrow path cannot handle is read by the C engine instead
+            df = None
+    if df is None:
+        df = pd.read_csv(
+            path,
+            sep=sep,
+            encoding="utf-8",
+            skipinitialspace=True,
+            low_memory=False,
+        )
+    return _tidy_frame(df)
+
+def _read_csv_arrow(path: Path, sep: str) -> pd.DataFrame:
+    df = pd.read_csv(path, sep=sep, encoding="utf-8", engine="pyarrow")
+    # The Arrow engine has no skipinitialspace, leaves blank headers empty and keeps duplicate headers
+    df.columns = _dedupe_names([str(c).lstrip() or f"Unnamed: {i}" for i, c in enumerate(df.columns)])
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        # Object columns may hold dates or mixed values, so only strip real strings
+        if col.dtype.kind == "O" and pd.api.types.infer_dtype(col, skipna=True) == "string":
+            df.isetitem(i, col.str.lstrip())
+    return df
+
+def _dedupe_names(names: list) -> list:
+    # Rename repeated headers to name.1, name.2, ... the way the C engine does
+    counts = {}
+    out = []
+    for name in names:
+        base = name
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            # Skip suffixes another header already uses
+            count = count + 1 if name in names else counts.get(name, 0)
+        out.append(name)
+        counts[name] = count + 1
+    return out
+
+def iter_data(path: Path, chunksize: int = CHUNK_ROWS, parse_times: bool = True) -> Iterator[pd.DataFrame]:
+    # Same cleanup as load_data, but yields frames of at most chunksize rows.
+    # With parse_times the time column is parsed as load_data would parse it in
+    # one go; a chunk that cannot match raises _ChunkTimesError.
+    if not path.exists():
+        raise FileNotFoundError(f"Input CSV not found: {path}")
+
+    sep = detect_delimiter(path)
+    # The Arrow engine cannot stream, so chunked reads always use the C engine
+    reader = pd.read_csv(path, sep=sep, encoding="utf-8", skipinitialspace=True, chunksize=chunksize)
+    return _iter_chunks(reader, parse_times)
+
+def _iter_chunks(reader, parse_times: bool) -> Iterator[pd.DataFrame]:
+    fmt = None
+    time_dtype = None
+    with reader:
+        for chunk in reader:
+            if parse_times and "time" in chunk.columns:
+                times = chunk["time"]
+                first = times.first_valid_index()
+                if time_dtype is None and first is not None:
+                    # pandas infers the format from the first time in the column
+                    value = times[first]
+                    fmt = guess_datetime_format(value) if isinstance(value, str) else None
+                parsed = _parse_chunk_times(times, fmt)
+                if first is None:
+                    # All-missing chunks take the column's type so chunks stay alike
+                    if time_dtype is not None:
+                        parsed = pd.Series(pd.NaT, index=times.index, name=times.name, dtype=time_dtype)
+                elif time_dtype is None:
+                    time_dtype = parsed.dtype
+                elif parsed.dtype != time_dtype:
+                    # e.g. a DST change moved the UTC offset; a whole-column parse rejects that too
+                    raise _ChunkTimesError(f"time zone changed from {time_dtype} to {parsed.dtype}")
+                chunk["time"] = parsed
+            yield _tidy_frame(chunk, parse_times=False)
+
+def _write_csv(df: pd.DataFrame, f, header: bool = True):
+    # f is a binary handle; Arrow's writer serializes columns in C++ across threads.
+    # Its CSV reads back the same but is not byte-identical to pandas': headers and
+    # strings are always quoted, whole floats are written as 1, booleans as true/false
+    # and timestamps with microseconds (plus Z when timezone-aware)
+    if _HAS_PYARROW:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Object columns mixing types (e.g. 1, 'two', 3.5) have no Arrow type;
+            # pandas writes them as text
+            table = None
+        if table is not None:
+            pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=header, batch_size=65536))
+            return
+    df.to_csv(f, index=False, header=header, encoding="utf-8")
+
 def write_clean_data(df: pd.DataFrame, out_path: Path):
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_path, index=False, encoding="utf-8")
+    with out_path.open("wb") as f:
+        _write_csv(df, f)
     print(f"Wrote cleaned CSV to {out_path} (rows={len(df)})")
 
-def main(input_path: Path = CSV_REL, output_path: Path = OUT_REL):
+def write_clean_chunks(chunks: Iterable[pd.DataFrame], out_path: Path):
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    with out_path.open("wb") as f:
+        for i, chunk in enumerate(chunks):
+            _write_csv(chunk, f, header=(i == 0))
+            rows += len(chunk)
+    print(f"Wrote cleaned CSV to {out_path} (rows={rows})")
+
+def _file_field(field: "pa.Field", col: "pa.ChunkedArray") -> "pa.Field":
+    # A column that is empty in the first chunk has no real type yet; store it as string
+    if col.null_count == len(col):
+        return field.with_type(pa.string())
+    # pandas sizes category codes to each chunk's category count (int8, then int16, ...),
+    # so fix a wide index type that every later chunk can be cast to
+    if pa.types.is_dictionary(field.type):
+        return field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+    return field
+
+def write_clean_parquet(chunks: Iterable[pd.DataFrame], out_path: Path):
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    writer = None
     try:
-        df = load_data(input_path)
-    except FileNotFoundError as e:
-        print(e, file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print("Error reading CSV:", e, file=sys.stderr)
-        sys.exit(2)
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = pa.schema(
+                    [_file_field(f, col) for f, col in zip(table.schema, table.columns)],
+                    metadata=table.schema.metadata,
+                )
+                writer = pq.ParquetWriter(out_path, schema, compression="zstd")
+            # Chunks are typed independently, so align each one to the file schema
+            try:
+                table = table.cast(writer.schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(f"Column types changed between chunks ({e}); "
+                                 "rerun with --csv or a larger chunksize") from e
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"Wrote cleaned Parquet to {out_path} (rows={rows})")
 
+def process_chunk(df: pd.DataFrame) -> pd.DataFrame:
     # Concatenate latitude and longitude and create a geo point
-    df['geo_point'] = df['longitude'].fillna('').astype(str).str.cat(
-                     df['latitude'].fillna('').astype(str),
-                     sep=',', na_rep=''
-    )
-    # Drop columns
-    cols_to_drop = ["elevation_in_meters", "sym", "latitude", "longitude"] #adjust as needed
-    df = df.drop(columns=[c for c in cols_to_drop if c in df.columns], errors="ignore")
+    geo_point = np.char.add(np.char.add(_coord_str(df['longitude']), ','), _coord_str(df['latitude']))
+    # Create primary key from the same string arrays, without a round trip through the frame
+    primary_key = _sha256_hex(np.char.add(_text_array(df['time']), geo_point))
 
-    # Create primary key
-    df['primary_key'] = df['time'].astype(str) + df['geo_point'].astype(str)
-    df['primary_key'] = df['primary_key'].apply(lambda x: hashlib.sha256(x.encode('utf-8')).hexdigest())
+    # Drop columns and add the new ones in a single copy of the frame
+    cols_to_drop = ["elevation_in_meters", "sym", "latitude", "longitude"] #adjust as needed
+    df = df.drop(columns=[c for c in cols_to_drop if c in df.columns]).assign(
+        geo_point=geo_point, primary_key=primary_key
+    )
     
     # Add columns
-    df["description_of_behavior"].astype(str)
-    df["image"].astype(str)
-    df["ranger_id"].astype(str)
-    df["ranger_notes"].astype(str)
-    df["direction_of_travel"].astype(str)
+    for c in ["description_of_behavior", "image", "ranger_id", "ranger_notes", "direction_of_travel"]:
+        if c not in df.columns:
+            df[c] = ""
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
 
     # LLM for searching area around sighting geo_point for surrounding area description
     # input code here
@@ -117,10 +331,44 @@ def main(input_path: Path = CSV_REL, output_path: Path = OUT_REL):
     # Add threat_level column
     df["threat_level"] = # Threat level LLM output
 
+    return df
 
+def main(input_path: Path = CSV_REL, output_path: Path | None = None, chunksize: int = CHUNK_ROWS,
+         csv_output: bool = False):
+    try:
+        chunks = iter_data(input_path, chunksize)
+    except FileNotFoundError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print("Error reading CSV:", e, file=sys.stderr)
+        sys.exit(2)
 
-    # Done: write result
-    write_clean_data(df, output_path)
+    # Parquet needs pyarrow; fall back to CSV without it
+    as_csv = csv_output or not _HAS_PYARROW
+    out_path = output_path or (OUT_REL if as_csv else OUT_PARQUET)
+    write = write_clean_chunks if as_csv else write_clean_parquet
+    try:
+        try:
+            # Transform and write one chunk at a time so memory stays bounded by chunksize
+            write((process_chunk(chunk) for chunk in chunks), out_path)
+        except _ChunkTimesError:
+            # load_data would keep this time column as text, so start over with
+            # every chunk's times left as text
+            chunks = iter_data(input_path, chunksize, parse_times=False)
+            write((process_chunk(chunk) for chunk in chunks), out_path)
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        # Chunks are read lazily, so bad input surfaces while writing
+        out_path.unlink(missing_ok=True)
+        print("Error reading CSV:", e, file=sys.stderr)
+        sys.exit(2)
+    except BaseException:
+        out_path.unlink(missing_ok=True)
+        raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean the raw animal sightings CSV")
+    parser.add_argument("--csv", action="store_true",
+                        help="Write the clean output as CSV instead of Parquet")
+    args = parser.parse_args()
+    main(csv_output=args.csv)
\ No newline at end of file
@@ -10,10 +10,21 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, Any
 import pandas as pd
 from pyspark.sql import DataFrame, SparkSession
-from pyspark.sql.functions import col, when, current_timestamp, lit
+from pyspark.sql.functions import col, when, current_timestamp, lit, expr
 from pyspark.sql.types import TimestampType, BooleanType
 
 
+def threshold_column(hours: int = 24):
+    """
+    Build a Spark expression for the cutoff ``hours`` before now.
+    
+    current_timestamp() is fixed once per query, so Catalyst folds the whole
+    expression to a single constant on the executors instead of the driver
+    shipping a Python datetime literal with every plan.
+    """
+    return current_timestamp() - expr(f"INTERVAL {int(hours)} HOURS")
+
+
 class iNaturalistTimeProcessor:
     """Process iNaturalist data to update time_observed_at based on 24-hour threshold."""
     
@@ -28,26 +39,16 @@ class iNaturalistTimeProcessor:
             input_df: DataFrame containing iNaturalist data with time_observed_at column
             
         Returns:
-            DataFrame with updated time_observed_at values
+            DataFrame with time_observed_at as a boolean (True if within 24 hours)
         """
-        # Get current timestamp for comparison
-        current_time = datetime.now(timezone.utc)
-        
-        # Calculate 24 hours ago
-        twenty_four_hours_ago = current_time - timedelta(hours=24)
-        
-        # Convert to Spark timestamp
-        threshold_timestamp = lit(twenty_four_hours_ago)
+        # 24-hour cutoff, evaluated by Spark rather than on the driver
+        threshold_timestamp = threshold_column(24)
         
-        # Update time_observed_at based on whether timestamp is older than 24 hours
+        # A single native comparison keeps the column boolean instead of mixing
+        # False with timestamps, and runs vectorized in whole-stage codegen
         processed_df = input_df.withColumn(
             "time_observed_at",
-            when(
-                col("time_observed_at") < threshold_timestamp,
-                lit(False)  # Set to False if older than 24 hours
-            ).otherwise(
-                col("time_observed_at")  # Keep original value if within 24 hours
-            )
+            col("time_observed_at") >= threshold_timestamp
         )
         
         return processed_df
@@ -63,10 +64,7 @@ class iNaturalistTimeProcessor:
         Returns:
             DataFrame with updated time_observed_at boolean values
         """
-        # Get current timestamp
-        current_time = datetime.now(timezone.utc)
-        twenty_four_hours_ago = current_time - timedelta(hours=24)
-        threshold_timestamp = lit(twenty_four_hours_ago)
+        threshold_timestamp = threshold_column(24)
         
         # If time_observed_at is a boolean column, update it based on timestamp age
         processed_df = input_df.withColumn(
@@ -91,9 +89,7 @@ class iNaturalistTimeProcessor:
         Returns:
             DataFrame with time_observed_at as boolean
         """
-        current_time = datetime.now(timezone.utc)
-        twenty_four_hours_ago = current_time - timedelta(hours=24)
-        threshold_timestamp = lit(twenty_four_hours_ago)
+        threshold_timestamp = threshold_column(24)
         
         # Convert timestamp to boolean based on 24-hour threshold
         processed_df = input_df.withColumn(
@@ -8,8 +8,7 @@ and includes some basic system checks.
 
 import sys
 import os
-import tkinter as tk
-from tkinter import messagebox
+import importlib.util
 
 
 def check_dependencies():
@@ -21,11 +20,11 @@ def check_dependencies():
         print("✗ tkinter is not available")
         return False
     
-    try:
-        from waypoint_video_correlator import WaypointVideoCorrelator
+    # Only locate the module here; it is imported once, when the GUI launches
+    if importlib.util.find_spec("waypoint_video_correlator") is not None:
         print("✓ waypoint_video_correlator module is available")
-    except ImportError as e:
-        print(f"✗ waypoint_video_correlator module not found: {e}")
+    else:
+        print("✗ waypoint_video_correlator module not found")
         return False
     
     return True
@@ -7,32 +7,47 @@ Features:
 - Drop selected columns
 - Concatenate chosen columns into a new column
 - Compute SHA256 hash of a column or concatenation
+- Compute a fast non-cryptographic 64-bit fingerprint of a column
 - Save cleaned CSV
 
 This is intentionally lightweight and uses functions from data_pipeline.py
 for reading/writing where possible.
 """
+from __future__ import annotations
+
 APP_TITLE = "FaunaTrace Ranger Portal"
 
 import hashlib
 import os
 import traceback
 from pathlib import Path
+from types import SimpleNamespace
 os.environ.setdefault("TK_SILENCE_DEPRECATION", "1")
 import tkinter as tk
 from tkinter import ttk, filedialog, simpledialog
 from tkinter.scrolledtext import ScrolledText
 
-import pandas as pd
+# pandas and data_pipeline are imported on first use rather than at module load:
+# pandas dominates startup time and the window should appear before it is needed.
+_pipeline_mod = None
+
 
-try:
-    from data_pipeline import load_data, write_clean_data, CSV_REL, OUT_REL, new_sighting
-except Exception:
-    # If import fails, fall back to local definitions (will log error)
-    load_data = None
-    write_clean_data = None
-    CSV_REL = Path.cwd() / "data" / "raw" / "raw" / "animal_sightings.csv"
-    OUT_REL = Path.cwd() / "data" / "clean" / "animal_sightings_clean.csv"
+def _pipeline():
+    """Return the data_pipeline module, or local fallbacks if it cannot be imported."""
+    global _pipeline_mod
+    if _pipeline_mod is None:
+        try:
+            import data_pipeline as mod
+        except Exception:
+            # If import fails, fall back to local definitions (will log error)
+            mod = SimpleNamespace(
+                load_data=None,
+                write_clean_data=None,
+                CSV_REL=Path.cwd() / "data" / "raw" / "raw" / "animal_sightings.csv",
+                OUT_REL=Path.cwd() / "data" / "clean" / "animal_sightings_clean.csv",
+            )
+        _pipeline_mod = mod
+    return _pipeline_mod
 
 
 class DataPipelineGUI(tk.Tk):
@@ -69,6 +84,7 @@ class DataPipelineGUI(tk.Tk):
         self.hash_entry = ttk.Entry(top, width=15)
         self.hash_entry.pack(side=tk.LEFT)
         ttk.Button(top, text="Hash from col", command=self.hash_from_col_prompt).pack(side=tk.LEFT, padx=4)
+        ttk.Button(top, text="Fingerprint col", command=lambda: self.hash_from_col_prompt(fingerprint=True)).pack(side=tk.LEFT)
 
         # Middle: columns list and treeview
         middle = ttk.Panedwindow(self, orient=tk.HORIZONTAL)
@@ -103,7 +119,7 @@ class DataPipelineGUI(tk.Tk):
 
     def load_default(self):
         try:
-            path = CSV_REL
+            path = _pipeline().CSV_REL
             self.load_path(path)
         except Exception as e:
             self.log_msg("Error loading default:", e)
@@ -118,10 +134,12 @@ class DataPipelineGUI(tk.Tk):
     def load_path(self, path: Path):
         self.log_msg("Loading:", path)
         try:
+            load_data = _pipeline().load_data
             if load_data:
                 df = load_data(path)
             else:
                 # fallback: basic pandas read
+                import pandas as pd
                 df = pd.read_csv(path)
             self.df = df
             self.current_path = Path(path)
@@ -154,14 +172,13 @@ class DataPipelineGUI(tk.Tk):
             self.tree.heading(c, text=c)
             self.tree.column(c, width=120, anchor='w')
 
-        for _, row in df.head(100)[cols].iterrows():
-            values = [self._cell_str(row[c]) for c in cols]
-            self.tree.insert('', tk.END, values=values)
-
-    def _cell_str(self, v):
-        if pd.isna(v):
-            return ""
-        return str(v)
+        # Stringify the preview block once and blank missing cells with a single mask,
+        # instead of a pd.isna call per cell
+        sub = df.head(100)[cols]
+        cells = sub.astype(str).to_numpy(dtype=object)
+        cells[sub.isna().to_numpy()] = ""
+        for row in cells:
+            self.tree.insert('', tk.END, values=row.tolist())
 
     def drop_selected_columns(self):
         if self.df is None:
@@ -200,14 +217,19 @@ class DataPipelineGUI(tk.Tk):
             for c in cols:
                 if c not in self.df.columns:
                     self.df[c] = ''
-            self.df[new_col] = self.df[cols].fillna('').astype(str).agg(sep.join, axis=1)
+            # Join column-wise with vectorized string adds instead of a per-row sep.join
+            parts = self.df[cols].fillna('').astype(str)
+            out = parts.iloc[:, 0]
+            for i in range(1, len(cols)):
+                out = out + sep + parts.iloc[:, i]
+            self.df[new_col] = out
             self._populate_columns()
             self.preview()
         except Exception as e:
             self.log_msg("Error concatenating:", e)
             self.log_msg(traceback.format_exc())
 
-    def hash_from_col_prompt(self):
+    def hash_from_col_prompt(self, fingerprint=False):
         if self.df is None:
             self.log_msg("No data loaded")
             return
@@ -220,13 +242,27 @@ class DataPipelineGUI(tk.Tk):
         new_col = simpledialog.askstring("Hash column name", "Name for hash column:", parent=self)
         if not new_col:
             return
-        self.hash_column(col, new_col)
-
-    def hash_column(self, source_col, new_col):
-        self.log_msg("Hashing column", source_col, "->", new_col)
+        self.hash_column(col, new_col, fingerprint=fingerprint)
+
+    def hash_column(self, source_col, new_col, fingerprint=False):
+        """
+        Hash source_col into new_col.
+
+        By default each value gets a SHA-256 hex digest. With fingerprint=True a
+        stable 64-bit pd.util.hash_pandas_object value is used instead: it is
+        computed in C and is much faster, but it is not cryptographic, so only
+        use it for join/dedupe keys, never to protect identities.
+        """
+        self.log_msg("Fingerprinting" if fingerprint else "Hashing", "column", source_col, "->", new_col)
         try:
             s = self.df[source_col].fillna('').astype(str)
-            self.df[new_col] = s.apply(lambda v: hashlib.sha256(v.encode('utf-8')).hexdigest())
+            if fingerprint:
+                import pandas as pd
+                self.df[new_col] = pd.util.hash_pandas_object(s, index=False)
+            else:
+                # Hash each distinct value once and map the digests back onto the rows
+                digests = {v: hashlib.sha256(v.encode('utf-8')).hexdigest() for v in s.unique()}
+                self.df[new_col] = s.map(digests)
             self._populate_columns()
             self.preview()
         except Exception as e:
@@ -237,13 +273,14 @@ class DataPipelineGUI(tk.Tk):
         if self.df is None:
             self.log_msg("No data to save")
             return
-        p = filedialog.asksaveasfilename(defaultextension='.csv', initialfile=OUT_REL.name)
+        pipeline = _pipeline()
+        p = filedialog.asksaveasfilename(defaultextension='.csv', initialfile=pipeline.OUT_REL.name)
         if not p:
             return
         out = Path(p)
         try:
-            if write_clean_data:
-                write_clean_data(self.df, out)
+            if pipeline.write_clean_data:
+                pipeline.write_clean_data(self.df, out)
             else:
                 out.parent.mkdir(parents=True, exist_ok=True)
                 self.df.to_csv(out, index=False, encoding='utf-8')
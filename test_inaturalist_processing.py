@@ -7,6 +7,7 @@ before deploying to Foundry.
 """
 
 from datetime import datetime, timezone, timedelta
+import numpy as np
 import pandas as pd
 
 
@@ -19,52 +20,68 @@ def process_inaturalist_time_data(df, threshold_hours=24):
         threshold_hours: Number of hours to use as threshold (default: 24)
         
     Returns:
-        pandas DataFrame with processed data
+        pandas DataFrame with processed data; processing_timestamp and
+        threshold_time are stored in its attrs
     """
     # Calculate threshold time
     current_time = datetime.now(timezone.utc)
     threshold_time = current_time - timedelta(hours=threshold_hours)
     
-    # Create a copy of the dataframe
-    processed_df = df.copy()
+    if 'time_observed_at' not in df.columns:
+        return df.copy()
     
-    # Process time_observed_at column
-    if 'time_observed_at' in processed_df.columns:
-        # Convert to datetime if it's not already
-        processed_df['time_observed_at'] = pd.to_datetime(processed_df['time_observed_at'])
-        
-        # Create a boolean mask for timestamps older than threshold
-        is_older_than_threshold = processed_df['time_observed_at'] < threshold_time
-        
-        # Update the column based on the threshold
-        processed_df['time_observed_at'] = ~is_older_than_threshold
-        
-        # Add metadata columns
-        processed_df['processing_timestamp'] = current_time
-        processed_df['threshold_time'] = threshold_time
-        processed_df['is_older_than_threshold'] = is_older_than_threshold
-        
+    # Convert to datetime if it's not already, parsing each distinct string once
+    times = df['time_observed_at']
+    if times.dtype.kind == 'O':
+        try:
+            times = pd.to_datetime(times, format='ISO8601', utc=True, cache=True)
+        except ValueError:
+            # Not ISO 8601 (e.g. iNaturalist's "2019-01-01 18:56:00 UTC" exports);
+            # let pandas infer the format instead
+            times = pd.to_datetime(times, utc=True, cache=True)
+    
+    # Create a boolean mask for timestamps older than threshold. The timezone is
+    # dropped once for the whole column and values compare as int64 UTC
+    # nanoseconds; NaT is stored as the smallest int64, so mask it back out
+    ticks = times.to_numpy(dtype='datetime64[ns]').view('int64')
+    threshold_ns = pd.Timestamp(threshold_time).value
+    is_older_than_threshold = pd.Series(
+        (ticks < threshold_ns) & (ticks != np.iinfo(np.int64).min), index=df.index
+    )
+    
+    # Update the column based on the threshold and add the flag column;
+    # assign() leaves the untouched columns uncopied instead of duplicating the frame
+    processed_df = df.assign(
+        time_observed_at=~is_older_than_threshold,
+        is_older_than_threshold=is_older_than_threshold,
+    )
+    
+    # Run-level metadata is one value per frame, so keep it in attrs rather than repeating it per row
+    processed_df.attrs['processing_timestamp'] = current_time
+    processed_df.attrs['threshold_time'] = threshold_time
     return processed_df
 
 
 def create_sample_data():
     """Create sample iNaturalist data for testing."""
+    # One clock read for the whole sample, so rows are offset from the same instant
+    now = datetime.now(timezone.utc)
     sample_data = {
         'observation_id': [
             'obs_001', 'obs_002', 'obs_003', 'obs_004', 'obs_005',
             'obs_006', 'obs_007', 'obs_008', 'obs_009', 'obs_010'
         ],
         'time_observed_at': [
-            datetime.now(timezone.utc) - timedelta(hours=2),   # Recent (should be True)
-            datetime.now(timezone.utc) - timedelta(hours=12),  # Recent (should be True)
-            datetime.now(timezone.utc) - timedelta(hours=25),  # Old (should be False)
-            datetime.now(timezone.utc) - timedelta(hours=48),  # Old (should be False)
-            datetime.now(timezone.utc) - timedelta(hours=6),   # Recent (should be True)
-            datetime.now(timezone.utc) - timedelta(hours=30),  # Old (should be False)
-            datetime.now(timezone.utc) - timedelta(hours=1),    # Recent (should be True)
-            datetime.now(timezone.utc) - timedelta(hours=72),   # Old (should be False)
-            datetime.now(timezone.utc) - timedelta(hours=18),   # Recent (should be True)
-            datetime.now(timezone.utc) - timedelta(hours=36),   # Old (should be False)
+            now - timedelta(hours=2),   # Recent (should be True)
+            now - timedelta(hours=12),  # Recent (should be True)
+            now - timedelta(hours=25),  # Old (should be False)
+            now - timedelta(hours=48),  # Old (should be False)
+            now - timedelta(hours=6),   # Recent (should be True)
+            now - timedelta(hours=30),  # Old (should be False)
+            now - timedelta(hours=1),   # Recent (should be True)
+            now - timedelta(hours=72),  # Old (should be False)
+            now - timedelta(hours=18),  # Recent (should be True)
+            now - timedelta(hours=36),  # Old (should be False)
         ],
         'species': [
             'Cardinal', 'Robin', 'Sparrow', 'Blue Jay', 'Finch',
@@ -93,6 +110,7 @@ def main():
     
     print("Processed data:")
     print(processed_df[['observation_id', 'time_observed_at', 'is_older_than_threshold', 'species']].to_string(index=False))
+    print(f"Threshold time: {processed_df.attrs['threshold_time']}")
     print()
     
     # Summary statistics
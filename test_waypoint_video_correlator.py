@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for waypoint-video name matching.
+
+Checks that the indexed matcher picks the same video as the original
+in-order scan over the four naming strategies.
+"""
+
+import os
+import random
+import unittest
+
+from waypoint_video_correlator import WaypointVideoCorrelator, _stem_lower
+
+
+def scan_matching_position(waypoint_name, stems):
+    """Reference matcher: the original in-order scan, returning the winning position."""
+    for i, video_name_without_ext in enumerate(stems):
+        # Strategy 1: Exact match
+        if waypoint_name == video_name_without_ext:
+            return i
+        # Strategy 2: Waypoint name contains video name
+        if waypoint_name in video_name_without_ext:
+            return i
+        # Strategy 3: Video name contains waypoint name
+        if video_name_without_ext in waypoint_name:
+            return i
+        # Strategy 4: Partial match (common words)
+        if set(waypoint_name.split('_')).intersection(video_name_without_ext.split('_')):
+            return i
+    return None
+
+
+def make_video_metadata(filenames):
+    """Minimal metadata in the shape VideoMetadataExtractor returns, keyed by path."""
+    return {
+        os.path.join('videos', filename): {
+            'filename': filename,
+            'creation_time': None,
+            'duration': None,
+            'stem_lower': _stem_lower(filename),
+        }
+        for filename in filenames
+    }
+
+
+class StemLowerTest(unittest.TestCase):
+    def test_matches_splitext(self):
+        for filename in ['site_001.MP4', 'a.b.MP4', '.mp4', '..mp4', '...', 'clip.', 'noext', 'A']:
+            with self.subTest(filename=filename):
+                self.assertEqual(_stem_lower(filename), os.path.splitext(filename)[0].lower())
+
+    def test_edge_cases(self):
+        self.assertEqual(_stem_lower('.mp4'), '.mp4')
+        self.assertEqual(_stem_lower('a.b.MP4'), 'a.b')
+        self.assertEqual(_stem_lower('...'), '...')
+
+
+class MatchPositionTest(unittest.TestCase):
+    def setUp(self):
+        self.correlator = WaypointVideoCorrelator('unused.gpx', 'unused')
+
+    def assert_same_as_scan(self, waypoint_name, filenames):
+        video_metadata = make_video_metadata(filenames)
+        video_index = self.correlator._build_video_index(video_metadata)
+        stems = [metadata['stem_lower'] for metadata in video_metadata.values()]
+        self.assertEqual(self.correlator._match_position(waypoint_name, video_index),
+                         scan_matching_position(waypoint_name, stems),
+                         msg=f"{waypoint_name!r} against {filenames!r}")
+
+    def test_strategies(self):
+        filenames = ['site_002_recording.mp4', 'site_001.mp4', 'overview.mov', 'b.mkv']
+        for waypoint_name in ['site_001', 'site', 'overview_extra', 'recording', 'b', 'zzz', '']:
+            with self.subTest(waypoint_name=waypoint_name):
+                self.assert_same_as_scan(waypoint_name, filenames)
+
+    def test_randomized_against_scan(self):
+        rng = random.Random(1234)
+        alphabet = 'ab_'
+        for _ in range(2000):
+            names = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+                     for _ in range(rng.randint(1, 8))]
+            filenames = [filename for filename in
+                         dict.fromkeys(name + rng.choice(['.mp4', '.MOV', '']) for name in names)
+                         if filename]
+            waypoint_name = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 7)))
+            self.assert_same_as_scan(waypoint_name, filenames)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,17 +10,95 @@ import os
 import sys
 import csv
 import argparse
+import bisect
+import dbm
+import functools
+import math
+import shelve
+import shutil
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-import xml.etree.ElementTree as ET
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
 import subprocess
 import json
 
+try:
+    # Optional: lxml's C parser; the stdlib ElementTree exposes the same iterparse API
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+try:
+    # Optional: MediaInfo reads video metadata in-process instead of spawning ffprobe per file
+    from pymediainfo import MediaInfo
+    _HAS_MEDIAINFO = MediaInfo.can_parse()
+except ImportError:
+    _HAS_MEDIAINFO = False
+
+try:
+    # Optional: C ISO 8601 parser for GPX and video timestamps, falls back to datetime.fromisoformat
+    from ciso8601 import parse_datetime as _ciso_parse_datetime
+except ImportError:
+    _ciso_parse_datetime = None
+
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v'})
+
+# Output CSV columns, in order
+FIELDNAMES = (
+    'waypoint_name', 'waypoint_lat', 'waypoint_lon', 'waypoint_timestamp',
+    'video_file', 'video_full_path', 'video_creation_time', 'video_duration',
+    'time_offset_seconds', 'time_offset_formatted', 'waypoint_description'
+)
+
+# On-disk video metadata cache shared across runs (shelve adds its own file extension)
+METADATA_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'waypoint_video_correlator', 'metadata')
+
+# Above this many cached files, entries for moved or changed files are pruned on close
+METADATA_CACHE_MAX_ENTRIES = 50000
+
+# Longest character n-gram indexed per video name; a waypoint name is only
+# searched for in videos whose names contain all of its n-grams
+MATCH_GRAM_LENGTH = 3
+
+# Write buffer for CSV output, large enough that big exports need few write calls
+CSV_BUFFER_SIZE = 1 << 20
+
+# One output row; a plain tuple in FIELDNAMES order, so csv.writer can write it as-is
+Correlation = namedtuple('Correlation', FIELDNAMES)
+
+
+def _stem_lower(filename: str) -> str:
+    """Lowercase file name without its extension, split the way os.path.splitext does."""
+    dot = filename.rfind('.')
+    # Leading dots belong to the name ('.mp4' has no extension)
+    if dot > 0 and filename[:dot].lstrip('.'):
+        filename = filename[:dot]
+    return filename.lower()
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso(text: str) -> datetime:
+    """Parse an ISO 8601 timestamp, raising ValueError if it is malformed."""
+    # Cached because videos from one shoot often share creation times
+    if _ciso_parse_datetime is not None:
+        return _ciso_parse_datetime(text)
+    return datetime.fromisoformat(text[:-1] + '+00:00' if text.endswith('Z') else text)
+
+
+@functools.lru_cache(maxsize=1)
+def _ffprobe_available() -> bool:
+    """Check once per process whether ffprobe is on PATH."""
+    return shutil.which('ffprobe') is not None
+
 
 class GPXParser:
     """Parse GPX files to extract waypoints with timestamps."""
     
+    # Child elements read from each <wpt>, qualified with the waypoint's namespace
+    CHILD_TAGS = ('name', 'time', 'desc')
+    
     def __init__(self, gpx_file: str):
         self.gpx_file = gpx_file
         self.waypoints = []
@@ -28,45 +106,36 @@ class GPXParser:
     def parse(self) -> List[Dict]:
         """Parse GPX file and return list of waypoints with metadata."""
         try:
-            tree = ET.parse(self.gpx_file)
-            root = tree.getroot()
-            
             waypoints = []
+            root = None
+            wpt_tag = None
+            tags = None
             
-            # Try different namespace approaches
-            # First, try to find namespace from root element
-            namespace = None
-            if root.tag.startswith('{'):
-                namespace = root.tag.split('}')[0] + '}'
-            
-            # Try with detected namespace
-            if namespace:
-                for wpt in root.findall(f'.//{{{namespace.split("}")[1]}}}wpt'):
-                    waypoint = self._extract_waypoint(wpt, namespace)
-                    if waypoint:
-                        waypoints.append(waypoint)
-            
-            # Try common GPX namespaces
-            if not waypoints:
-                namespaces = {
-                    'gpx': 'http://www.topografix.com/GPX/1/1',
-                    'gpx10': 'http://www.topografix.com/GPX/1/0'
-                }
+            # Stream the file once, matching <wpt> in any namespace (GPX 1.1, 1.0 or none)
+            for event, elem in ET.iterparse(self.gpx_file, events=('start', 'end')):
+                if root is None:
+                    root = elem
+                if event != 'end' or elem.tag.rpartition('}')[2] != 'wpt':
+                    continue
                 
-                for ns_prefix, ns_uri in namespaces.items():
-                    for wpt in root.findall(f'.//{{{ns_uri}}}wpt'):
-                        waypoint = self._extract_waypoint(wpt, ns_uri)
-                        if waypoint:
-                            waypoints.append(waypoint)
-                    if waypoints:  # Stop if we found waypoints
-                        break
+                # Exact '{ns}name' tags take the parser's direct-child fast path,
+                # so build them once per namespace rather than using '{*}' wildcards
+                if elem.tag != wpt_tag:
+                    wpt_tag = elem.tag
+                    namespace = wpt_tag[:-len('wpt')]
+                    tags = tuple(namespace + tag for tag in self.CHILD_TAGS)
+                
+                waypoint = self._extract_waypoint(elem, tags)
+                if waypoint:
+                    waypoints.append(waypoint)
+                
+                # Drop finished waypoints so memory stays flat on large files
+                root.clear()
             
-            # If still no waypoints, try without namespace
-            if not waypoints:
-                for wpt in root.findall('.//wpt'):
-                    waypoint = self._extract_waypoint(wpt, '')
-                    if waypoint:
-                        waypoints.append(waypoint)
+            # Parse timestamps in one batch after the XML walk, once per distinct string
+            parsed = {raw: self._parse_timestamp(raw) for raw in {w['timestamp'] for w in waypoints} if raw}
+            for waypoint in waypoints:
+                waypoint['timestamp'] = parsed.get(waypoint['timestamp'])
             
             self.waypoints = waypoints
             return waypoints
@@ -78,48 +147,22 @@ class GPXParser:
             print(f"Unexpected error reading GPX file: {e}")
             return []
     
-    def _extract_waypoint(self, wpt_element, namespace: str) -> Optional[Dict]:
+    def _extract_waypoint(self, wpt_element, tags: Tuple[str, str, str]) -> Optional[Dict]:
         """Extract waypoint data from XML element."""
         try:
             lat = float(wpt_element.get('lat', 0))
             lon = float(wpt_element.get('lon', 0))
             
             # Extract name
-            name_elem = None
-            if namespace:
-                # Try with namespace
-                name_elem = wpt_element.find(f'.//{{{namespace}}}name')
-            if name_elem is None:
-                # Try without namespace
-                name_elem = wpt_element.find('.//name')
-            
+            name_elem = wpt_element.find(tags[0])
             name = name_elem.text.strip() if name_elem is not None and name_elem.text else ""
             
-            # Extract timestamp
-            time_elem = None
-            if namespace:
-                # Try with namespace
-                time_elem = wpt_element.find(f'.//{{{namespace}}}time')
-            if time_elem is None:
-                # Try without namespace
-                time_elem = wpt_element.find('.//time')
-            
-            timestamp = None
-            if time_elem is not None and time_elem.text:
-                try:
-                    # Parse ISO 8601 timestamp
-                    timestamp = datetime.fromisoformat(time_elem.text.replace('Z', '+00:00'))
-                except ValueError:
-                    pass
+            # Extract timestamp (raw text; parse() converts these in one batch)
+            time_elem = wpt_element.find(tags[1])
+            timestamp = time_elem.text if time_elem is not None else None
             
             # Extract description if available
-            desc_elem = None
-            if namespace:
-                # Try with namespace
-                desc_elem = wpt_element.find(f'.//{{{namespace}}}desc')
-            if desc_elem is None:
-                # Try without namespace
-                desc_elem = wpt_element.find('.//desc')
+            desc_elem = wpt_element.find(tags[2])
             
             description = desc_elem.text.strip() if desc_elem is not None and desc_elem.text else ""
             
@@ -134,28 +177,148 @@ class GPXParser:
         except (ValueError, AttributeError) as e:
             print(f"Error extracting waypoint data: {e}")
             return None
+    
+    @staticmethod
+    def _parse_timestamp(text: str) -> Optional[datetime]:
+        """Parse an ISO 8601 timestamp, returning None if it is malformed."""
+        try:
+            return _parse_iso(text)
+        except ValueError:
+            return None
 
 
 class VideoMetadataExtractor:
     """Extract metadata from video files using ffprobe."""
     
-    def __init__(self):
-        self.ffprobe_available = self._check_ffprobe()
+    def __init__(self, cache_path: Optional[str] = METADATA_CACHE_PATH):
+        self.ffprobe_available = _ffprobe_available()
+        # Persistent cache, opened on first use; None disables it
+        self.cache_path = cache_path
+        self._cache = None
+        self._cache_lock = threading.Lock()
     
-    def _check_ffprobe(self) -> bool:
-        """Check if ffprobe is available."""
-        try:
-            subprocess.run(['ffprobe', '-version'], 
-                         capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Flush and close the on-disk metadata cache (it reopens on next use)."""
+        with self._cache_lock:
+            if self._cache is not None:
+                self._prune_cache()
+                self._cache.close()
+                self._cache = None
+    
+    def _prune_cache(self):
+        """Bound the shelf once it passes METADATA_CACHE_MAX_ENTRIES. Call with the lock held."""
+        if len(self._cache) <= METADATA_CACHE_MAX_ENTRIES:
+            return
+        # Entries are keyed by path, so only files that moved or changed since they were cached are stale
+        for path in list(self._cache.keys()):
+            try:
+                stat = os.stat(path)
+                fresh = self._cache[path][:2] == (stat.st_mtime_ns, stat.st_size)
+            except Exception:
+                fresh = False
+            if not fresh:
+                del self._cache[path]
+        if len(self._cache) > METADATA_CACHE_MAX_ENTRIES:
+            # Still over the cap with only live files; start the cache afresh
+            self._cache.clear()
+    
+    def _open_cache(self):
+        """Return the open shelf, or None if there is no usable cache. Call with the lock held."""
+        if self._cache is None and self.cache_path:
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                self._cache = shelve.open(self.cache_path)
+            except dbm.error as e:
+                # Unwritable directory or another process holding the file; run uncached
+                print(f"Metadata cache unavailable: {e}")
+                self.cache_path = None
+        return self._cache
     
     def extract_metadata(self, video_file: str) -> Dict:
         """Extract metadata from video file."""
-        if not self.ffprobe_available:
-            return self._extract_fallback_metadata(video_file)
+        try:
+            stat = os.stat(video_file)
+        except OSError:
+            metadata = self._extract_fallback_metadata(video_file)
+        else:
+            # Checked against mtime/size so re-scanning an unchanged directory skips the probes,
+            # both within this process (lru_cache) and across runs (the shelf). The shelf holds
+            # one entry per path, so a changed file replaces its old entry
+            source = 'mediainfo' if _HAS_MEDIAINFO else 'ffprobe' if self.ffprobe_available else 'stat'
+            path = os.path.abspath(video_file)
+            stamp = (stat.st_mtime_ns, stat.st_size, source)
+            with self._cache_lock:
+                cache = self._open_cache()
+                entry = cache.get(path) if cache is not None else None
+            if entry is not None and entry[:3] == stamp:
+                metadata = entry[3]
+            else:
+                metadata, complete = self._read_metadata(video_file, stat.st_mtime_ns, stat.st_size,
+                                                         self.ffprobe_available)
+                # A failed probe falls back to file times; keep those out of the shelf so
+                # the next run probes the file again
+                if complete:
+                    with self._cache_lock:
+                        cache = self._open_cache()
+                        if cache is not None:
+                            cache[path] = stamp + (metadata,)
+            metadata = dict(metadata)
+        # Lowercase name without extension, computed once here for waypoint matching
+        metadata['stem_lower'] = _stem_lower(metadata['filename'])
+        return metadata
+    
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def _read_metadata(cls, video_file: str, mtime_ns: int, size: int, use_ffprobe: bool) -> Tuple[Dict, bool]:
+        """Read metadata from the best available source; the flag is False if a probe failed."""
+        if _HAS_MEDIAINFO:
+            metadata = cls._extract_mediainfo_metadata(video_file)
+        elif use_ffprobe:
+            metadata = cls._extract_ffprobe_metadata(video_file)
+        else:
+            return cls._extract_fallback_metadata(video_file), True
+        if metadata is None:
+            return cls._extract_fallback_metadata(video_file), False
+        return metadata, True
+    
+    @classmethod
+    def _extract_mediainfo_metadata(cls, video_file: str) -> Optional[Dict]:
+        """Extract metadata in-process with pymediainfo, or None if it fails."""
+        try:
+            general = MediaInfo.parse(video_file).general_tracks[0]
+        except Exception as e:
+            print(f"Error extracting video metadata: {e}")
+            return None
+        
+        # MediaInfo reports dates like 'UTC 2024-01-15 10:25:00' or '2024-01-15 10:25:00 UTC'
+        creation_time = None
+        for value in (general.encoded_date, general.tagged_date):
+            if value:
+                try:
+                    creation_time = datetime.fromisoformat(value.replace('UTC', '').strip()).replace(tzinfo=timezone.utc)
+                    break
+                except ValueError:
+                    continue
+        
+        # Duration is in milliseconds
+        duration = float(general.duration) / 1000 if general.duration else None
         
+        return {
+            'creation_time': creation_time,
+            'duration': duration,
+            'file_size': os.path.getsize(video_file),
+            'filename': os.path.basename(video_file)
+        }
+    
+    @classmethod
+    def _extract_ffprobe_metadata(cls, video_file: str) -> Optional[Dict]:
+        """Extract metadata by running ffprobe on the file, or None if it fails."""
         try:
             cmd = [
                 'ffprobe', '-v', 'quiet', '-print_format', 'json',
@@ -171,7 +334,7 @@ class VideoMetadataExtractor:
                 for time_key in ['creation_time', 'date', 'com.apple.quicktime.creationdate']:
                     if time_key in tags:
                         try:
-                            creation_time = datetime.fromisoformat(tags[time_key].replace('Z', '+00:00'))
+                            creation_time = _parse_iso(tags[time_key])
                             break
                         except ValueError:
                             continue
@@ -190,9 +353,10 @@ class VideoMetadataExtractor:
             
         except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
             print(f"Error extracting video metadata: {e}")
-            return self._extract_fallback_metadata(video_file)
+            return None
     
-    def _extract_fallback_metadata(self, video_file: str) -> Dict:
+    @staticmethod
+    def _extract_fallback_metadata(video_file: str) -> Dict:
         """Fallback metadata extraction using file system."""
         try:
             stat = os.stat(video_file)
@@ -244,136 +408,195 @@ class WaypointVideoCorrelator:
         
         # Extract metadata from all videos
         video_metadata = {}
-        for video_file in video_files:
+        for video_file, metadata in self._iter_video_metadata(video_files):
             print(f"Processing video: {os.path.basename(video_file)}")
-            metadata = self.video_extractor.extract_metadata(video_file)
             video_metadata[video_file] = metadata
         
-        # Correlate waypoints with videos
-        correlations = self._correlate_waypoints_videos(waypoints, video_metadata)
-        
-        # Write CSV output
+        # Correlate waypoints with videos, writing each row as it is produced
+        correlations = self._iter_correlations(waypoints, video_metadata)
         self._write_csv(correlations, output_file)
         
         print(f"Correlation complete. Results saved to: {output_file}")
         return True
     
+    def _iter_video_metadata(self, video_files: List[str]):
+        """Yield (video_file, metadata) pairs in input order, extracting on a thread pool."""
+        # Each ffprobe call waits on a subprocess, so threads overlap them
+        # instead of running one at a time
+        workers = min(32, (os.cpu_count() or 4) * 4)
+        with self.video_extractor, ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from zip(video_files, executor.map(self.video_extractor.extract_metadata, video_files))
+    
     def _find_video_files(self) -> List[str]:
         """Find all video files in the directory."""
-        video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.m4v'}
-        video_files = []
-        
-        for root, dirs, files in os.walk(self.video_directory):
-            for file in files:
-                if Path(file).suffix.lower() in video_extensions:
-                    video_files.append(os.path.join(root, file))
-        
-        return sorted(video_files)
+        return sorted(self._iter_video_files(self.video_directory))
+    
+    def _iter_video_files(self, directory: str):
+        """Yield video file paths below directory, recursing like os.walk."""
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                # DirEntry caches its type, so no extra stat per file
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        yield from self._iter_video_files(entry.path)
+                    continue
+                name = entry.name
+                dot = name.rfind('.')
+                if dot > 0 and name[dot:].lower() in VIDEO_EXTENSIONS:
+                    yield entry.path
     
-    def _correlate_waypoints_videos(self, waypoints: List[Dict], video_metadata: Dict) -> List[Dict]:
+    def _correlate_waypoints_videos(self, waypoints: List[Dict], video_metadata: Dict) -> List[Correlation]:
         """Correlate waypoints with video files based on naming keys."""
-        correlations = []
+        return list(self._iter_correlations(waypoints, video_metadata))
+    
+    def _iter_correlations(self, waypoints: List[Dict], video_metadata: Dict) -> Iterator[Correlation]:
+        """Yield one correlation per waypoint, in waypoint order, without building a list."""
+        video_index = self._build_video_index(video_metadata)
+        video_fields = video_index[-1]
         
         for waypoint in waypoints:
             waypoint_name = waypoint['name'].lower()
             
             # Find matching video based on naming key
-            matching_video = self._find_matching_video(waypoint_name, video_metadata)
+            position = self._match_position(waypoint_name, video_index)
             
-            if matching_video:
-                video_file, metadata = matching_video
+            if position is not None:
+                filename, video_file, creation_time, creation_iso, duration = video_fields[position]
                 
                 # Calculate time offset within video
                 time_offset = None
-                if waypoint['timestamp'] and metadata['creation_time']:
-                    time_diff = waypoint['timestamp'] - metadata['creation_time']
+                if waypoint['timestamp'] and creation_time:
+                    time_diff = waypoint['timestamp'] - creation_time
                     time_offset = time_diff.total_seconds()
                 
-                correlation = {
-                    'waypoint_name': waypoint['name'],
-                    'waypoint_lat': waypoint['lat'],
-                    'waypoint_lon': waypoint['lon'],
-                    'waypoint_timestamp': waypoint['timestamp'].isoformat() if waypoint['timestamp'] else '',
-                    'video_file': os.path.basename(video_file),
-                    'video_full_path': video_file,
-                    'video_creation_time': metadata['creation_time'].isoformat() if metadata['creation_time'] else '',
-                    'video_duration': metadata['duration'],
-                    'time_offset_seconds': time_offset,
-                    'time_offset_formatted': self._format_time_offset(time_offset) if time_offset is not None else '',
-                    'waypoint_description': waypoint['description']
-                }
+                correlation = Correlation(
+                    waypoint_name=waypoint['name'],
+                    waypoint_lat=waypoint['lat'],
+                    waypoint_lon=waypoint['lon'],
+                    waypoint_timestamp=waypoint['timestamp'].isoformat() if waypoint['timestamp'] else '',
+                    video_file=filename,
+                    video_full_path=video_file,
+                    video_creation_time=creation_iso,
+                    video_duration=duration,
+                    time_offset_seconds=time_offset,
+                    time_offset_formatted=self._format_time_offset(time_offset) if time_offset is not None else '',
+                    waypoint_description=waypoint['description']
+                )
             else:
                 # No matching video found
-                correlation = {
-                    'waypoint_name': waypoint['name'],
-                    'waypoint_lat': waypoint['lat'],
-                    'waypoint_lon': waypoint['lon'],
-                    'waypoint_timestamp': waypoint['timestamp'].isoformat() if waypoint['timestamp'] else '',
-                    'video_file': 'NO_MATCH',
-                    'video_full_path': '',
-                    'video_creation_time': '',
-                    'video_duration': '',
-                    'time_offset_seconds': '',
-                    'time_offset_formatted': '',
-                    'waypoint_description': waypoint['description']
-                }
+                correlation = Correlation(
+                    waypoint_name=waypoint['name'],
+                    waypoint_lat=waypoint['lat'],
+                    waypoint_lon=waypoint['lon'],
+                    waypoint_timestamp=waypoint['timestamp'].isoformat() if waypoint['timestamp'] else '',
+                    video_file='NO_MATCH',
+                    video_full_path='',
+                    video_creation_time='',
+                    video_duration='',
+                    time_offset_seconds='',
+                    time_offset_formatted='',
+                    waypoint_description=waypoint['description']
+                )
             
-            correlations.append(correlation)
+            yield correlation
+    
+    def _build_video_index(self, video_metadata: Dict) -> Tuple:
+        """Precompute video name lookups shared by every waypoint match."""
+        videos = list(video_metadata.items())
+        stems = [metadata['stem_lower'] for metadata in video_metadata.values()]
+        
+        # First position of each name and each '_'-separated word, so a lookup
+        # gives the same video the in-order scan would have returned
+        first_by_stem = {}
+        first_by_word = {}
+        for i, stem in enumerate(stems):
+            first_by_stem.setdefault(stem, i)
+            for word in stem.split('_'):
+                first_by_word.setdefault(word, i)
+        
+        stem_lengths = sorted({len(stem) for stem in stems})
+        
+        # Ascending positions of the videos containing each 1..MATCH_GRAM_LENGTH character
+        # substring, so substring candidates can be cut off at a position with bisect
+        positions_by_gram = {}
+        for i, stem in enumerate(stems):
+            grams = {stem[start:start + n]
+                     for n in range(1, MATCH_GRAM_LENGTH + 1)
+                     for start in range(len(stem) - n + 1)}
+            for gram in grams:
+                positions_by_gram.setdefault(gram, []).append(i)
         
-        return correlations
+        # Output fields per video, formatted once here rather than for every waypoint it matches
+        video_fields = [
+            (metadata['filename'], video_file, metadata['creation_time'],
+             metadata['creation_time'].isoformat() if metadata['creation_time'] else '',
+             metadata['duration'])
+            for video_file, metadata in videos
+        ]
+        return videos, stems, first_by_stem, first_by_word, stem_lengths, positions_by_gram, video_fields
     
-    def _find_matching_video(self, waypoint_name: str, video_metadata: Dict) -> Optional[Tuple[str, Dict]]:
+    def _find_matching_video(self, waypoint_name: str, video_index: Tuple) -> Optional[Tuple[str, Dict]]:
         """Find video file that matches waypoint name."""
-        # Try different matching strategies
-        for video_file, metadata in video_metadata.items():
-            video_filename = os.path.basename(video_file).lower()
-            video_name_without_ext = os.path.splitext(video_filename)[0]
-            
-            # Strategy 1: Exact match
-            if waypoint_name == video_name_without_ext:
-                return video_file, metadata
-            
-            # Strategy 2: Waypoint name contains video name
-            if waypoint_name in video_name_without_ext:
-                return video_file, metadata
-            
-            # Strategy 3: Video name contains waypoint name
-            if video_name_without_ext in waypoint_name:
-                return video_file, metadata
-            
-            # Strategy 4: Partial match (common words)
-            waypoint_words = set(waypoint_name.split('_'))
-            video_words = set(video_name_without_ext.split('_'))
-            if waypoint_words.intersection(video_words):
-                return video_file, metadata
+        position = self._match_position(waypoint_name, video_index)
+        return video_index[0][position] if position is not None else None
+    
+    def _match_position(self, waypoint_name: str, video_index: Tuple) -> Optional[int]:
+        """Return the index of the video matching waypoint name, or None."""
+        videos, stems, first_by_stem, first_by_word, stem_lengths, positions_by_gram, _ = video_index
+        # Videos are tried in order and the first one passing any strategy wins,
+        # so checks run cheapest first and stop once the first video has matched
+        best = len(videos)
+        
+        # Strategy 1: Exact match
+        best = first_by_stem.get(waypoint_name, best)
+        
+        # Strategy 4: Partial match (common words)
+        for word in set(waypoint_name.split('_')):
+            best = min(best, first_by_word.get(word, best))
+        
+        # Strategy 3: Video name contains waypoint name
+        for length in stem_lengths:
+            if best == 0 or length > len(waypoint_name):
+                break
+            for start in range(len(waypoint_name) - length + 1):
+                best = min(best, first_by_stem.get(waypoint_name[start:start + length], best))
+        
+        # Strategy 2: Waypoint name contains video name; only videos ahead of the best so far can win,
+        # and only those containing every n-gram of the name, so walk the rarest n-gram's positions
+        if not waypoint_name:
+            best = 0
+        elif best:
+            n = min(MATCH_GRAM_LENGTH, len(waypoint_name))
+            candidates = min((positions_by_gram.get(waypoint_name[start:start + n], ())
+                              for start in range(len(waypoint_name) - n + 1)), key=len)
+            for k in range(bisect.bisect_left(candidates, best)):
+                if waypoint_name in stems[candidates[k]]:
+                    best = candidates[k]
+                    break
         
-        return None
+        return best if best < len(videos) else None
     
     def _format_time_offset(self, seconds: float) -> str:
         """Format time offset as HH:MM:SS."""
         if seconds is None:
             return ""
         
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
+        # Floor to whole seconds once, then split with integer divmods
+        hours, rem = divmod(math.floor(seconds), 3600)
+        minutes, secs = divmod(rem, 60)
         
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
     
-    def _write_csv(self, correlations: List[Dict], output_file: str):
-        """Write correlations to CSV file."""
-        if not correlations:
-            return
-        
-        fieldnames = [
-            'waypoint_name', 'waypoint_lat', 'waypoint_lon', 'waypoint_timestamp',
-            'video_file', 'video_full_path', 'video_creation_time', 'video_duration',
-            'time_offset_seconds', 'time_offset_formatted', 'waypoint_description'
-        ]
-        
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+    def _write_csv(self, correlations: Iterable[Correlation], output_file: str):
+        """Write correlations to CSV file; a generator is written row by row as it yields."""
+        # Rows may come from a generator, so emptiness is unknown up front; the header is always written
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(FIELDNAMES)
             writer.writerows(correlations)
 
 
@@ -8,10 +8,44 @@ A graphical user interface for the waypoint-video correlation tool.
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
+import time
+import functools
+import gzip
 import os
-import csv
-from pathlib import Path
-from waypoint_video_correlator import WaypointVideoCorrelator
+import shutil
+from waypoint_video_correlator import WaypointVideoCorrelator, CSV_BUFFER_SIZE
+
+# Per-video log lines are inserted in batches of this many, or after this long
+LOG_BATCH_SIZE = 32
+LOG_FLUSH_SECONDS = 0.05
+
+# Scroll the results area to new output at most this often (~30 fps)
+RENDER_INTERVAL_MS = 33
+
+# Progress output is trimmed to this many lines so the Text widget stays responsive
+MAX_LOG_LINES = 5000
+
+# How long input-path existence checks are reused, in seconds
+EXISTS_TTL_SECONDS = 5
+
+# Correlations formatted and handed to the Tk thread per insert while results stream in
+RESULTS_BATCH_SIZE = 200
+
+# Above this many correlations only the summary is shown; the CSV has every row
+MAX_DISPLAYED_RESULTS = 2000
+
+
+@functools.lru_cache(maxsize=128)
+def _exists_cached(path, bucket):
+    """os.path.exists memoized per time bucket; bucket changes expire old entries."""
+    return os.path.exists(path)
+
+
+def _path_exists(path):
+    """Check that an input path exists, reusing the answer for EXISTS_TTL_SECONDS."""
+    # Only for UI validation, so repeated clicks on network paths skip the stat;
+    # the correlator itself always reads the filesystem directly
+    return _exists_cached(path, int(time.monotonic() // EXISTS_TTL_SECONDS))
 
 
 class WaypointVideoGUI:
@@ -27,7 +61,24 @@ class WaypointVideoGUI:
         self.gpx_file = tk.StringVar()
         self.video_directory = tk.StringVar()
         self.output_file = tk.StringVar(value="waypoint_video_correlation.csv")
-        self.correlation_results = []
+        # CSV written by the last successful run; exports copy it rather than
+        # keeping every correlation in memory
+        self.results_file = None
+        # (mtime_ns, size) of results_file when the run finished writing it
+        self._results_stamp = None
+        # Folder the file dialogs open in, following the user's last pick
+        self._last_dir = os.path.expanduser('~')
+        
+        # Pending (text, tag) log lines and when they were last handed to the
+        # Tk thread; only the worker thread touches these
+        self._log_buffer = []
+        self._last_log_flush = time.monotonic()
+        
+        # New output waiting to be scrolled into view, and whether a render tick is queued
+        self._dirty = False
+        self._tick_scheduled = False
+        # Set while correlation results are shown so they are never trimmed
+        self._keep_full_log = False
         
         self.setup_ui()
         self.center_window()
@@ -88,7 +139,8 @@ class WaypointVideoGUI:
         self.export_button.pack(side=tk.LEFT)
         
         # Progress Bar
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        # Determinate, so it only repaints when the worker reports progress
+        self.progress = ttk.Progressbar(main_frame, mode='determinate')
         self.progress.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
         
         # Status Label
@@ -103,8 +155,14 @@ class WaypointVideoGUI:
         main_frame.rowconfigure(7, weight=1)
         
         # Results Text Area
-        self.results_text = scrolledtext.ScrolledText(results_frame, height=15, width=80)
+        # Append-only log: no undo history, and no wrapping so long lines are not re-laid out
+        self.results_text = scrolledtext.ScrolledText(results_frame, height=15, width=80,
+                                                      undo=False, autoseparators=False, maxundo=0,
+                                                      wrap=tk.NONE)
         self.results_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        x_scrollbar = ttk.Scrollbar(results_frame, orient=tk.HORIZONTAL, command=self.results_text.xview)
+        x_scrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.results_text.configure(xscrollcommand=x_scrollbar.set)
         
         # Configure text tags for formatting
         self.results_text.tag_configure("header", font=("Arial", 10, "bold"))
@@ -125,25 +183,30 @@ class WaypointVideoGUI:
         """Browse for GPX file."""
         filename = filedialog.askopenfilename(
             title="Select GPX File",
+            initialdir=self._last_dir,
             filetypes=[("GPX files", "*.gpx"), ("All files", "*.*")]
         )
         if filename:
+            self._last_dir = os.path.dirname(filename)
             self.gpx_file.set(filename)
     
     def browse_video_directory(self):
         """Browse for video directory."""
-        directory = filedialog.askdirectory(title="Select Video Directory")
+        directory = filedialog.askdirectory(title="Select Video Directory", initialdir=self._last_dir)
         if directory:
+            self._last_dir = directory
             self.video_directory.set(directory)
     
     def browse_output_file(self):
         """Browse for output CSV file."""
         filename = filedialog.asksaveasfilename(
             title="Save Correlation Results As",
+            initialdir=self._last_dir,
             defaultextension=".csv",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
         if filename:
+            self._last_dir = os.path.dirname(filename)
             self.output_file.set(filename)
     
     def clear_all(self):
@@ -152,7 +215,8 @@ class WaypointVideoGUI:
         self.video_directory.set("")
         self.output_file.set("waypoint_video_correlation.csv")
         self.results_text.delete(1.0, tk.END)
-        self.correlation_results = []
+        self.results_file = None
+        self._results_stamp = None
         self.export_button.config(state=tk.DISABLED)
         self.status_label.config(text="Ready to correlate waypoints with videos")
     
@@ -166,27 +230,82 @@ class WaypointVideoGUI:
         else:
             self.status_label.config(foreground="black")
     
+    def _post(self, fn, *args):
+        """Run fn(*args) on the Tk thread; the worker must not touch widgets directly."""
+        self.root.after(0, fn, *args)
+    
     def log_message(self, message, tag=""):
         """Add message to results text area."""
         self.results_text.insert(tk.END, message + "\n", tag)
-        self.results_text.see(tk.END)
-        self.root.update_idletasks()
+        self._mark_dirty()
+    
+    def _insert_chunks(self, chunks):
+        """Insert alternating text/tag pairs with a single Text call."""
+        self.results_text.insert(tk.END, *chunks)
+        self._mark_dirty()
+    
+    def _mark_dirty(self):
+        """Note new output and make sure a render tick is queued to show it."""
+        self._dirty = True
+        if not self._tick_scheduled:
+            self._tick_scheduled = True
+            self.root.after(RENDER_INTERVAL_MS, self._render_tick)
+    
+    def _render_tick(self):
+        """Scroll to the newest output once per tick, however many lines arrived."""
+        self._tick_scheduled = False
+        if self._dirty:
+            self._dirty = False
+            if not self._keep_full_log:
+                self._trim_log()
+            self.results_text.see(tk.END)
+    
+    def _trim_log(self):
+        """Drop the oldest lines in one delete once the log exceeds MAX_LOG_LINES."""
+        line_count = int(self.results_text.index('end-1c').split('.')[0])
+        if line_count > MAX_LOG_LINES:
+            self.results_text.delete('1.0', f'{line_count - MAX_LOG_LINES + 1}.0')
+    
+    def _start_progress(self, total):
+        """Reset the progress bar to count total steps."""
+        self.progress.config(maximum=total, value=0)
+    
+    def _set_progress(self, done):
+        """Show done steps on the progress bar."""
+        self.progress.config(value=done)
+    
+    def _flush_log(self, force=False):
+        """Hand buffered log lines to the Tk thread as one insert once the batch is due; True if sent."""
+        if not self._log_buffer:
+            return False
+        if not force and (len(self._log_buffer) < LOG_BATCH_SIZE and
+                          time.monotonic() - self._last_log_flush < LOG_FLUSH_SECONDS):
+            return False
+        # Text.insert takes alternating text/tag arguments, so one call covers every line
+        chunks = [part for line in self._log_buffer for part in line]
+        self._log_buffer = []
+        self._last_log_flush = time.monotonic()
+        self._post(self._insert_chunks, chunks)
+        return True
     
     def validate_inputs(self):
         """Validate input files and directories."""
-        if not self.gpx_file.get():
+        gpx_file = self.gpx_file.get()
+        video_directory = self.video_directory.get()
+        
+        if not gpx_file:
             messagebox.showerror("Error", "Please select a GPX file")
             return False
         
-        if not os.path.exists(self.gpx_file.get()):
+        if not _path_exists(gpx_file):
             messagebox.showerror("Error", "GPX file does not exist")
             return False
         
-        if not self.video_directory.get():
+        if not video_directory:
             messagebox.showerror("Error", "Please select a video directory")
             return False
         
-        if not os.path.exists(self.video_directory.get()):
+        if not _path_exists(video_directory):
             messagebox.showerror("Error", "Video directory does not exist")
             return False
         
@@ -199,107 +318,147 @@ class WaypointVideoGUI:
         
         # Disable run button and start progress
         self.run_button.config(state=tk.DISABLED)
-        self.progress.start()
+        self.progress.config(value=0)
         self.results_text.delete(1.0, tk.END)
+        self._keep_full_log = False
         self.export_button.config(state=tk.DISABLED)
         
-        # Start correlation in separate thread
-        thread = threading.Thread(target=self._correlation_worker)
+        # Start correlation in separate thread; Tk variables are read here,
+        # since the worker must not call into Tk itself
+        thread = threading.Thread(
+            target=self._correlation_worker,
+            args=(self.gpx_file.get(), self.video_directory.get(), self.output_file.get())
+        )
         thread.daemon = True
         thread.start()
     
-    def _correlation_worker(self):
-        """Worker function for correlation process."""
+    def _correlation_worker(self, gpx_file, video_directory, output_file):
+        """Worker function for correlation process; all UI updates go through _post."""
         try:
-            self.log_message("Starting correlation process...", "header")
-            self.update_status("Parsing GPX file...")
+            self._post(self.log_message, "Starting correlation process...", "header")
+            self._post(self.update_status, "Parsing GPX file...")
             
             # Create correlator
-            correlator = WaypointVideoCorrelator(
-                self.gpx_file.get(), 
-                self.video_directory.get()
-            )
+            correlator = WaypointVideoCorrelator(gpx_file, video_directory)
             
             # Parse GPX
             waypoints = correlator.gpx_parser.parse()
             if not waypoints:
-                self.log_message("ERROR: No waypoints found in GPX file", "error")
-                self._correlation_finished(False)
+                self._post(self.log_message, "ERROR: No waypoints found in GPX file", "error")
+                self._post(self._correlation_finished, False)
                 return
             
-            self.log_message(f"Found {len(waypoints)} waypoints", "success")
+            self._post(self.log_message, f"Found {len(waypoints)} waypoints", "success")
             
             # Find video files
             video_files = correlator._find_video_files()
             if not video_files:
-                self.log_message("ERROR: No video files found in directory", "error")
-                self._correlation_finished(False)
+                self._post(self.log_message, "ERROR: No video files found in directory", "error")
+                self._post(self._correlation_finished, False)
                 return
             
-            self.log_message(f"Found {len(video_files)} video files", "success")
+            self._post(self.log_message, f"Found {len(video_files)} video files", "success")
+            
+            # One progress step per video, then one per waypoint
+            self._post(self._start_progress, len(video_files) + len(waypoints))
             
             # Extract video metadata
-            self.update_status("Extracting video metadata...")
+            self._post(self.update_status, "Extracting video metadata...")
             video_metadata = {}
-            for i, video_file in enumerate(video_files, 1):
-                self.log_message(f"Processing video {i}/{len(video_files)}: {os.path.basename(video_file)}")
-                metadata = correlator.video_extractor.extract_metadata(video_file)
+            total = len(video_files)
+            # Extraction runs on the correlator's thread pool; results arrive in file order
+            for i, (video_file, metadata) in enumerate(correlator._iter_video_metadata(video_files), 1):
+                self._log_buffer.append((f"Processing video {i}/{total}: {os.path.basename(video_file)}\n", ""))
+                # Progress moves with the log batches rather than posting once per video
+                if self._flush_log():
+                    self._post(self._set_progress, i)
                 video_metadata[video_file] = metadata
+            self._flush_log(force=True)
+            self._post(self._set_progress, total)
             
-            # Correlate waypoints with videos
-            self.update_status("Correlating waypoints with videos...")
-            correlations = correlator._correlate_waypoints_videos(waypoints, video_metadata)
-            
-            # Save results
-            self.update_status("Saving results...")
-            correlator._write_csv(correlations, self.output_file.get())
-            
-            # Store results for display
-            self.correlation_results = correlations
+            # Correlate waypoints with videos, streaming each row to the CSV and
+            # each batch to the results area so only one batch is held at a time
+            self._post(self.update_status, "Correlating waypoints and saving results...")
+            self._post(self._begin_results)
+            correlations = correlator._iter_correlations(waypoints, video_metadata)
+            correlator._write_csv(self._stream_results(correlations, len(waypoints), total), output_file)
+            self.results_file = output_file
+            self._results_stamp = self._file_stamp(output_file)
             
-            # Display results
-            self._display_results(correlations)
-            
-            self.log_message(f"\nCorrelation completed successfully!", "success")
-            self.log_message(f"Results saved to: {self.output_file.get()}", "success")
-            self._correlation_finished(True)
+            self._post(self.log_message, f"\nCorrelation completed successfully!", "success")
+            self._post(self.log_message, f"Results saved to: {output_file}", "success")
+            self._post(self._correlation_finished, True)
             
         except Exception as e:
-            self.log_message(f"ERROR: {str(e)}", "error")
-            self._correlation_finished(False)
+            # Keep any queued progress lines ahead of the error
+            self._flush_log(force=True)
+            self._post(self.log_message, f"ERROR: {str(e)}", "error")
+            self._post(self._correlation_finished, False)
     
-    def _display_results(self, correlations):
-        """Display correlation results in the text area."""
-        self.log_message("\n" + "="*80, "header")
-        self.log_message("CORRELATION RESULTS", "header")
-        self.log_message("="*80, "header")
-        
+    def _begin_results(self):
+        """Start the results block; it is never trimmed while results are shown."""
+        self._keep_full_log = True
+        rule = "="*80
+        self._insert_chunks([f"\n{rule}\nCORRELATION RESULTS\n{rule}\n", "header"])
+    
+    def _stream_results(self, correlations, total, progress_done):
+        """Pass correlations through unchanged, posting them and progress to the results area in batches."""
+        # Tens of thousands of entries would swamp the Text widget, so large runs only count
+        show_entries = total <= MAX_DISPLAYED_RESULTS
         matched_count = 0
-        unmatched_count = 0
-        
+        batch = []
+        i = 0
         for i, correlation in enumerate(correlations, 1):
-            waypoint_name = correlation['waypoint_name']
-            video_file = correlation['video_file']
-            time_offset = correlation['time_offset_formatted']
-            description = correlation['waypoint_description']
+            if correlation.video_file != 'NO_MATCH':
+                matched_count += 1
+            if show_entries:
+                batch.append(correlation)
+                if len(batch) == RESULTS_BATCH_SIZE:
+                    self._post(self._insert_chunks, self._format_results(batch, i - len(batch) + 1))
+                    batch = []
+            if i % RESULTS_BATCH_SIZE == 0:
+                self._post(self._set_progress, progress_done + i)
+            yield correlation
+        if batch:
+            self._post(self._insert_chunks, self._format_results(batch, i - len(batch) + 1))
+        self._post(self._set_progress, progress_done + i)
+        
+        rule = "="*80
+        chunks = []
+        if not show_entries:
+            chunks += (f"\nSummary only: {i} correlations, see the CSV for every entry\n", "warning")
+        chunks += (f"\n{rule}\nSUMMARY: {matched_count} matched, {i - matched_count} unmatched\n{rule}\n", "header")
+        self._post(self._insert_chunks, chunks)
+    
+    @staticmethod
+    def _format_results(correlations, start):
+        """Format a batch of correlations, numbered from start, as alternating text/tag pairs."""
+        chunks = []
+        for i, correlation in enumerate(correlations, start):
+            waypoint_name = correlation.waypoint_name
+            video_file = correlation.video_file
+            time_offset = correlation.time_offset_formatted
+            description = correlation.waypoint_description
             
             if video_file == 'NO_MATCH':
-                self.log_message(f"\n{i}. ❌ {waypoint_name} - NO VIDEO MATCH", "error")
-                self.log_message(f"   Description: {description}")
-                unmatched_count += 1
+                chunks += (f"\n{i}. ❌ {waypoint_name} - NO VIDEO MATCH\n", "error",
+                           f"   Description: {description}\n", "")
             else:
-                self.log_message(f"\n{i}. ✅ {waypoint_name} → {video_file}", "success")
-                self.log_message(f"   Time Offset: {time_offset}")
-                self.log_message(f"   Description: {description}")
-                matched_count += 1
-        
-        self.log_message(f"\n" + "="*80, "header")
-        self.log_message(f"SUMMARY: {matched_count} matched, {unmatched_count} unmatched", "header")
-        self.log_message("="*80, "header")
+                chunks += (f"\n{i}. ✅ {waypoint_name} → {video_file}\n", "success",
+                           f"   Time Offset: {time_offset}\n   Description: {description}\n", "")
+        return chunks
+    
+    @staticmethod
+    def _file_stamp(path):
+        """Return (mtime_ns, size) for path, or None if it cannot be read."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
     
     def _correlation_finished(self, success):
         """Handle correlation completion."""
-        self.progress.stop()
         self.run_button.config(state=tk.NORMAL)
         
         if success:
@@ -310,28 +469,46 @@ class WaypointVideoGUI:
     
     def export_results(self):
         """Export results to a different file."""
-        if not self.correlation_results:
+        if not self.results_file:
             messagebox.showwarning("Warning", "No results to export")
             return
         
+        # Exports copy the run's CSV, so make sure it is still the file the run wrote
+        stamp = self._file_stamp(self.results_file)
+        if stamp is None:
+            messagebox.showerror("Error", f"Results file {self.results_file} no longer exists. "
+                                          "Run the correlation again to export.")
+            return
+        if stamp != self._results_stamp:
+            messagebox.showerror("Error", f"Results file {self.results_file} has changed since the run. "
+                                          "Run the correlation again to export.")
+            return
+        
+        # No defaultextension: Tk would append ".csv" even with the gzip type selected,
+        # so the suffix comes from the chosen file type below
+        file_type = tk.StringVar(master=self.root, value="CSV files")
         filename = filedialog.asksaveasfilename(
             title="Export Results As",
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            initialdir=self._last_dir,
+            filetypes=[("CSV files", "*.csv"), ("Gzipped CSV files", "*.csv.gz"), ("All files", "*.*")],
+            typevariable=file_type
         )
         
         if filename:
+            if not os.path.splitext(filename)[1]:
+                filename += ".csv.gz" if file_type.get() == "Gzipped CSV files" else ".csv"
+            self._last_dir = os.path.dirname(filename)
             try:
-                fieldnames = [
-                    'waypoint_name', 'waypoint_lat', 'waypoint_lon', 'waypoint_timestamp',
-                    'video_file', 'video_full_path', 'video_creation_time', 'video_duration',
-                    'time_offset_seconds', 'time_offset_formatted', 'waypoint_description'
-                ]
-                
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(self.correlation_results)
+                # The run already wrote these rows, so the export is a file copy;
+                # level 1 gzip is fast enough to cost less than the bytes it saves on slow disks
+                if os.path.exists(filename) and os.path.samefile(filename, self.results_file):
+                    # Exporting onto the run's own output: the rows are already there
+                    pass
+                elif filename.endswith('.gz'):
+                    with open(self.results_file, 'rb') as src, gzip.open(filename, 'wb', compresslevel=1) as dst:
+                        shutil.copyfileobj(src, dst, CSV_BUFFER_SIZE)
+                else:
+                    shutil.copyfile(self.results_file, filename)
                 
                 messagebox.showinfo("Success", f"Results exported to {filename}")
                 